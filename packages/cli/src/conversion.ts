@@ -4,7 +4,6 @@ import type { InputSource } from './types.ts'
 import * as fsp from 'node:fs/promises'
 import * as path from 'node:path'
 import process from 'node:process'
-import { estimateTokenCount } from 'tokenx'
 import { decodeStream, encode, encodeLines } from '../../toon/src/index.ts'
 import { CliError } from './errors.ts'
 import { jsonStreamFromEvents } from './json-from-events.ts'
@@ -44,6 +43,8 @@ export async function encodeToToon(config: {
       console.log(toonOutput)
     }
 
+    // Only `--stats` needs the tokenizer, so plain conversions never load it.
+    const { estimateTokenCount } = await import('tokenx')
     const jsonTokens = estimateTokenCount(jsonContent)
     const toonTokens = estimateTokenCount(toonOutput)
     const diff = jsonTokens - toonTokens
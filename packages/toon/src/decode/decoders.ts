@@ -6,10 +6,26 @@ import { findClosingQuote, findUnquotedChar, trimSpaces } from '../shared/string
 import { ToonDecodeError, withLine } from './errors.ts'
 import { createLineReader, driveAsync, driveSync, peekLine, readLine } from './line-reader.ts'
 import { countLeafFields, isArrayHeaderContent, isKeyValueContent, mapRowValuesToPrimitives, parseArrayHeaderLine, parseDelimitedValues, parseKeyToken, parsePrimitiveToken } from './parser.ts'
+import { isListItemContent } from './scanner.ts'
 import { assertExpectedCount, isDataRow, validateNoBlankLinesInRange, validateNoExtraListItems, validateNoExtraTabularRows } from './validation.ts'
 
 interface DecoderContext { indentSize: number, strict: boolean }
 
+interface ObjectFieldsFrame {
+  baseDepth: Depth
+  computedDepth: Depth | undefined
+  seenKeys: Set<string> | undefined
+}
+
+/**
+ * One step of a header's field tree flattened in row order: a leaf reads row
+ * cell `cell`, a group opens a nested object that the next `groupEnd` closes.
+ */
+type RowPlanStep
+  = | { kind: 'leaf', name: string, cell: number }
+    | { kind: 'group', name: string }
+    | { kind: 'groupEnd' }
+
 function resolveContext(options?: DecodeStreamOptions): DecoderContext {
   return {
     indentSize: options?.indentSize ?? options?.indent ?? 2,
@@ -131,8 +147,7 @@ function overIndentedLineError(line: ParsedLine, expectedDepth: Depth): ToonDeco
 // Both modes reject a bare token outside root primitive position, so it must not reach
 // the non-strict paths that drop an over-indented line.
 function assertNotScalarLine(line: ParsedLine): void {
-  const isListItem = line.content.startsWith(LIST_ITEM_PREFIX) || line.content === LIST_ITEM_MARKER
-  if (isListItem || findUnquotedChar(line.content, COLON) !== -1) {
+  if (line.isListItem || findUnquotedChar(line.content, COLON) !== -1) {
     return
   }
 
@@ -200,6 +215,24 @@ function* decodeKeyValue(
   options: DecoderContext,
   seenKeys?: Set<string>,
 ): LineRule {
+  if (yield* decodeKeyValueHead(line, reader, baseDepth, options, seenKeys)) {
+    yield* decodeObjectFields(reader, baseDepth + 1, options)
+    yield { type: 'endObject' }
+  }
+}
+
+/**
+ * Decodes a key-value line, stopping short of a nested object's fields: returns
+ * `true` after opening a nested object, whose fields the caller decodes at
+ * `baseDepth + 1` before closing it.
+ */
+function* decodeKeyValueHead(
+  line: ParsedLine,
+  reader: LineReader,
+  baseDepth: Depth,
+  options: DecoderContext,
+  seenKeys?: Set<string>,
+): LineRule<boolean> {
   const content = line.content
 
   const arrayHeader = withLine(line, () => resolveArrayHeader(parseArrayHeaderLine(content, DEFAULT_DELIMITER), options.strict))
@@ -207,7 +240,7 @@ function* decodeKeyValue(
     assertNoDuplicateKey(arrayHeader.header.key, line, seenKeys)
     yield { type: 'key', key: arrayHeader.header.key }
     yield* decodeArrayFromHeader(arrayHeader.header, arrayHeader.inlineValues, reader, baseDepth, options, line)
-    return
+    return false
   }
 
   if (arrayHeader && arrayHeader.header.key === undefined && options.strict) {
@@ -225,23 +258,22 @@ function* decodeKeyValue(
     if (nextLine && nextLine.depth > baseDepth) {
       assertNoDepthJump(nextLine, baseDepth, options.strict)
       yield { type: 'startObject' }
-      yield* decodeObjectFields(reader, baseDepth + 1, options)
-      yield { type: 'endObject' }
-      return
+      return true
     }
 
     yield { type: 'startObject' }
     yield { type: 'endObject' }
-    return
+    return false
   }
 
   if (rest === '[]') {
     yield { type: 'startArray', length: 0 }
     yield { type: 'endArray' }
-    return
+    return false
   }
 
   yield { type: 'primitive', value: withLine(line, () => parsePrimitiveToken(rest)) }
+  return false
 }
 
 function* decodeObjectFields(
@@ -249,36 +281,53 @@ function* decodeObjectFields(
   baseDepth: Depth,
   options: DecoderContext,
 ): LineRule {
-  let computedDepth: Depth | undefined
-  const seenKeys = options.strict ? new Set<string>() : undefined
+  // Nested objects push a frame instead of recursing, so every event of a deep
+  // object tree passes through one generator rather than one per nesting level.
+  const frames: ObjectFieldsFrame[] = [createObjectFieldsFrame(baseDepth, options)]
 
-  while (true) {
+  while (frames.length > 0) {
+    const frame = frames[frames.length - 1]!
     const line = yield* peekLine(reader)
-    if (!line || line.depth < baseDepth) {
-      break
-    }
 
-    if (computedDepth === undefined && line.depth >= baseDepth) {
-      computedDepth = line.depth
-    }
+    if (line && line.depth >= frame.baseDepth) {
+      if (frame.computedDepth === undefined) {
+        frame.computedDepth = line.depth
+      }
 
-    if (line.depth === computedDepth) {
-      yield* readLine(reader)
-      yield* decodeKeyValue(line, reader, computedDepth, options, seenKeys)
-    }
-    else if (computedDepth !== undefined && line.depth > computedDepth) {
-      if (options.strict) {
-        throw overIndentedLineError(line, computedDepth)
+      if (line.depth === frame.computedDepth) {
+        yield* readLine(reader)
+        if (yield* decodeKeyValueHead(line, reader, frame.computedDepth, options, frame.seenKeys)) {
+          frames.push(createObjectFieldsFrame(frame.computedDepth + 1, options))
+        }
+        continue
+      }
+
+      if (line.depth > frame.computedDepth) {
+        if (options.strict) {
+          throw overIndentedLineError(line, frame.computedDepth)
+        }
+        assertNotScalarLine(line)
+        yield* readLine(reader)
+        continue
       }
-      assertNotScalarLine(line)
-      yield* readLine(reader)
     }
-    else {
-      break
+
+    // The outermost frame's object is closed by the caller that opened it.
+    frames.pop()
+    if (frames.length > 0) {
+      yield { type: 'endObject' }
     }
   }
 }
 
+function createObjectFieldsFrame(baseDepth: Depth, options: DecoderContext): ObjectFieldsFrame {
+  return {
+    baseDepth,
+    computedDepth: undefined,
+    seenKeys: options.strict ? new Set<string>() : undefined,
+  }
+}
+
 function* decodeArrayFromHeader(
   header: ArrayHeaderInfo,
   inlineValues: string | undefined,
@@ -341,6 +390,7 @@ function* decodeKeyedObject(
 ): LineRule {
   const entryDepth = baseDepth + 1
   const leafFieldCount = countLeafFields(header.fields!)
+  const rowPlan = compileRowPlan(header.fields!)
   const seenEntryKeys = options.strict ? new Set<string>() : undefined
   let entryCount = 0
   let startLine: number | undefined
@@ -391,13 +441,12 @@ function* decodeKeyedObject(
     yield { type: 'key', key }
 
     const cellsContent = trimSpaces(line.content.slice(end))
-    const values = cellsContent === ''
-      ? []
-      : withLine(line, () => parseDelimitedValues(cellsContent, header.delimiter))
-    assertExpectedCount(values.length, leafFieldCount, 'keyed entry cells', options, line)
-
-    const primitives = withLine(line, () => mapRowValuesToPrimitives(values))
-    yield* yieldObjectFromFields(header.fields!, primitives)
+    const primitives = withLine(line, () => {
+      const values = cellsContent === '' ? [] : parseDelimitedValues(cellsContent, header.delimiter)
+      assertExpectedCount(values.length, leafFieldCount, 'keyed entry cells', options, line)
+      return mapRowValuesToPrimitives(values)
+    })
+    yield* yieldObjectFromRowPlan(rowPlan, primitives)
 
     entryCount++
   }
@@ -419,6 +468,8 @@ function* decodeTabularArray(
   headerLine: ParsedLine,
 ): LineRule {
   const rowDepth = baseDepth + 1
+  const leafFieldCount = countLeafFields(header.fields!)
+  const rowPlan = compileRowPlan(header.fields!)
   let rowCount = 0
   let startLine: number | undefined
   let endLine: number | undefined
@@ -443,11 +494,14 @@ function* decodeTabularArray(
       lastRowLine = line
 
       yield* readLine(reader)
-      const values = withLine(line, () => parseDelimitedValues(line.content, header.delimiter))
-      assertExpectedCount(values.length, countLeafFields(header.fields!), 'tabular row values', options, line)
-
-      const primitives = withLine(line, () => mapRowValuesToPrimitives(values))
-      yield* yieldObjectFromFields(header.fields!, primitives)
+      // One guarded call per row: the count check throws a `ToonDecodeError`,
+      // which `withLine` passes through untouched.
+      const primitives = withLine(line, () => {
+        const values = parseDelimitedValues(line.content, header.delimiter)
+        assertExpectedCount(values.length, leafFieldCount, 'tabular row values', options, line)
+        return mapRowValuesToPrimitives(values)
+      })
+      yield* yieldObjectFromRowPlan(rowPlan, primitives)
 
       rowCount++
     }
@@ -488,9 +542,7 @@ function* decodeListArray(
       break
     }
 
-    const isListItem = line.content.startsWith(LIST_ITEM_PREFIX) || line.content === LIST_ITEM_MARKER
-
-    if (line.depth === itemDepth && isListItem) {
+    if (line.depth === itemDepth && line.isListItem) {
       if (startLine === undefined) {
         startLine = line.lineNumber
       }
@@ -563,10 +615,13 @@ function* decodeListItem(
     return
   }
 
-  const itemLine: ParsedLine = { ...line, content: afterHyphen }
+  const itemLine: ParsedLine = { ...line, content: afterHyphen, isListItem: isListItemContent(afterHyphen) }
+
+  // Both the keyless-array and the keyed-header checks below read this one parse.
+  const headerResult = withLine(itemLine, () => parseArrayHeaderLine(afterHyphen, DEFAULT_DELIMITER))
 
   if (isArrayHeaderContent(afterHyphen)) {
-    const arrayHeader = withLine(itemLine, () => resolveArrayHeader(parseArrayHeaderLine(afterHyphen, DEFAULT_DELIMITER), options.strict))
+    const arrayHeader = withLine(itemLine, () => resolveArrayHeader(headerResult, options.strict))
     if (arrayHeader) {
       // There is no keyless keyed or fields-bearing list-item form.
       if (arrayHeader.header.keyed || arrayHeader.header.fields !== undefined) {
@@ -581,7 +636,7 @@ function* decodeListItem(
     }
   }
 
-  const headerInfo = withLine(itemLine, () => resolveArrayHeader(parseArrayHeaderLine(afterHyphen, DEFAULT_DELIMITER), options.strict))
+  const headerInfo = withLine(itemLine, () => resolveArrayHeader(headerResult, options.strict))
   if (headerInfo && headerInfo.header.key !== undefined && headerInfo.header.fields !== undefined) {
     const header = headerInfo.header
     const seenKeys = options.strict ? new Set<string>([header.key!]) : undefined
@@ -677,33 +732,53 @@ function resolveArrayHeader(
   return { header: result.header, inlineValues: result.inlineValues }
 }
 
-function* yieldObjectFromFields(
-  fields: readonly FieldNode[],
-  primitives: readonly JsonPrimitive[],
-): Generator<JsonStreamEvent> {
-  let cellIndex = 0
+// The field tree is the same for every row of a table, so it is walked once
+// per header here rather than once per row.
+function compileRowPlan(fields: readonly FieldNode[]): RowPlanStep[] {
+  const steps: RowPlanStep[] = []
+  let cell = 0
 
-  function* walkFieldGroup(nodes: readonly FieldNode[]): Generator<JsonStreamEvent> {
-    yield { type: 'startObject' }
+  const visit = (nodes: readonly FieldNode[]): void => {
     for (const node of nodes) {
-      // A non-strict width mismatch leaves trailing leaf fields with no cell; they are absent, not undefined.
-      if (!node.children && cellIndex >= primitives.length) {
-        continue
-      }
-
-      yield { type: 'key', key: node.name }
       if (node.children) {
-        yield* walkFieldGroup(node.children)
+        steps.push({ kind: 'group', name: node.name })
+        visit(node.children)
+        steps.push({ kind: 'groupEnd' })
       }
       else {
-        yield { type: 'primitive', value: primitives[cellIndex++]! }
+        steps.push({ kind: 'leaf', name: node.name, cell: cell++ })
       }
     }
-
-    yield { type: 'endObject' }
   }
 
-  yield* walkFieldGroup(fields)
+  visit(fields)
+  return steps
+}
+
+function* yieldObjectFromRowPlan(
+  plan: readonly RowPlanStep[],
+  primitives: readonly JsonPrimitive[],
+): Generator<JsonStreamEvent> {
+  yield { type: 'startObject' }
+  for (const step of plan) {
+    switch (step.kind) {
+      case 'leaf':
+        // A non-strict width mismatch leaves trailing leaf fields with no cell; they are absent, not undefined.
+        if (step.cell < primitives.length) {
+          yield { type: 'key', key: step.name }
+          yield { type: 'primitive', value: primitives[step.cell]! }
+        }
+        break
+      case 'group':
+        yield { type: 'key', key: step.name }
+        yield { type: 'startObject' }
+        break
+      case 'groupEnd':
+        yield { type: 'endObject' }
+        break
+    }
+  }
+  yield { type: 'endObject' }
 }
 
 // #endregion
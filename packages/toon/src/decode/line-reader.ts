@@ -8,7 +8,7 @@ import { createScanState, parseLineIncremental } from './scanner.ts'
 // both sync and async sources.
 export const FETCH_LINE: unique symbol = Symbol('fetch-line')
 
-export type LineRule = Generator<JsonStreamEvent | typeof FETCH_LINE, void, string | undefined>
+export type LineRule<TReturn = void> = Generator<JsonStreamEvent | typeof FETCH_LINE, TReturn, string | undefined>
 
 export type LineEffect<TReturn> = Generator<typeof FETCH_LINE, TReturn, string | undefined>
 
@@ -17,7 +17,8 @@ export type LineEffect<TReturn> = Generator<typeof FETCH_LINE, TReturn, string |
 // #region Line reader
 
 export interface LineReader {
-  buffer: ParsedLine[]
+  /** The one line of lookahead, parsed but not yet read. */
+  pending: ParsedLine | undefined
   done: boolean
   lastLine: ParsedLine | undefined
   scanState: StreamingScanState
@@ -27,7 +28,7 @@ export interface LineReader {
 
 export function createLineReader(context: { indentSize: number, strict: boolean }): LineReader {
   return {
-    buffer: [],
+    pending: undefined,
     done: false,
     lastLine: undefined,
     scanState: createScanState(),
@@ -38,8 +39,8 @@ export function createLineReader(context: { indentSize: number, strict: boolean
 
 // At most one line of lookahead, so scanner throws and blank accounting keep
 // their original ordering.
-function* fillBuffer(reader: LineReader): LineEffect<void> {
-  while (reader.buffer.length === 0 && !reader.done) {
+function* fillPending(reader: LineReader): LineEffect<void> {
+  while (reader.pending === undefined && !reader.done) {
     const raw = yield FETCH_LINE
     if (raw === undefined) {
       reader.done = true
@@ -47,22 +48,26 @@ function* fillBuffer(reader: LineReader): LineEffect<void> {
     }
 
     const parsedLine = parseLineIncremental(raw, reader.scanState, reader.indentSize, reader.strict)
-    if (parsedLine !== undefined) {
-      reader.buffer.push(parsedLine)
-    }
+    reader.pending = parsedLine
   }
 }
 
+// Most reads follow a peek of the same line, so a pending line is returned
+// without starting the fill generator.
 export function* peekLine(reader: LineReader): LineEffect<ParsedLine | undefined> {
-  yield* fillBuffer(reader)
-  return reader.buffer[0]
+  if (reader.pending === undefined) {
+    yield* fillPending(reader)
+  }
+  return reader.pending
 }
 
 export function* readLine(reader: LineReader): LineEffect<ParsedLine | undefined> {
-  yield* fillBuffer(reader)
-  const line = reader.buffer[0]
+  if (reader.pending === undefined) {
+    yield* fillPending(reader)
+  }
+  const line = reader.pending
   if (line !== undefined) {
-    reader.buffer.shift()
+    reader.pending = undefined
     reader.lastLine = line
   }
 
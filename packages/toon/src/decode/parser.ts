@@ -1,6 +1,6 @@
 import type { ArrayHeaderInfo, Delimiter, FieldNode, JsonPrimitive } from '../types.ts'
 import { BACKSLASH, CLOSE_BRACE, CLOSE_BRACKET, COLON, DELIMITERS, DOUBLE_QUOTE, FALSE_LITERAL, NULL_LITERAL, OPEN_BRACE, OPEN_BRACKET, PIPE, TAB, TRUE_LITERAL } from '../constants.ts'
-import { isBooleanOrNullLiteral, isNumericLiteral } from '../shared/literal-utils.ts'
+import { parseNumericLiteral } from '../shared/literal-utils.ts'
 import { findClosingQuote, findUnquotedChar, trimSpaces, unescapeString } from '../shared/string-utils.ts'
 
 // #region Array header parsing
@@ -18,11 +18,24 @@ export function parseArrayHeaderLine(
   content: string,
   defaultDelimiter: Delimiter,
 ): ArrayHeaderParseResult {
+  // Most key-value lines rule themselves out before any quote-aware scan: a header
+  // needs a `[`, and a quote-free prefix ending in a colon before it makes a plain
+  // key-value line.
+  const firstBracketIndex = content.indexOf(OPEN_BRACKET)
+  if (firstBracketIndex === -1) {
+    return { kind: 'notHeader' }
+  }
+  const firstColonCandidate = content.indexOf(COLON)
+  if (firstColonCandidate !== -1 && firstColonCandidate < firstBracketIndex && content.lastIndexOf(DOUBLE_QUOTE, firstColonCandidate) === -1) {
+    return { kind: 'notHeader' }
+  }
+
   const trimmedToken = content.trimStart()
 
   let bracketStart = -1
+  const isQuotedKey = trimmedToken.startsWith(DOUBLE_QUOTE)
 
-  if (trimmedToken.startsWith(DOUBLE_QUOTE)) {
+  if (isQuotedKey) {
     const closingQuoteIndex = findClosingQuote(trimmedToken, 0)
     if (closingQuoteIndex === -1) {
       return { kind: 'notHeader' }
@@ -56,11 +69,17 @@ export function parseArrayHeaderLine(
     return { kind: 'notHeader' }
   }
 
-  let colonIndex = bracketEnd + 1
-  let braceEnd = colonIndex
+  // Unquoted keys reach `[` and `]` on the same quote-state walk as the first-colon
+  // scan, so a first colon past `]` is also the first colon after it.
+  const colonAfterBracket = !isQuotedKey && (firstColonIndex === -1 || firstColonIndex > bracketEnd)
+    ? firstColonIndex
+    : findUnquotedChar(content, COLON, bracketEnd)
+
+  let braceEnd = bracketEnd + 1
+  let matchingBraceIndex = -1
 
   const braceStart = findUnquotedChar(content, OPEN_BRACE, bracketEnd)
-  if (braceStart !== -1 && braceStart < findUnquotedChar(content, COLON, bracketEnd)) {
+  if (braceStart !== -1 && braceStart < colonAfterBracket) {
     const gapBeforeBrace = content.slice(bracketEnd + 1, braceStart)
     if (gapBeforeBrace !== '') {
       const trimmedGap = gapBeforeBrace.trim()
@@ -72,13 +91,16 @@ export function parseArrayHeaderLine(
       }
     }
 
-    const foundBraceEnd = findMatchingBrace(content, braceStart)
-    if (foundBraceEnd !== -1) {
-      braceEnd = foundBraceEnd + 1
+    matchingBraceIndex = findMatchingBrace(content, braceStart)
+    if (matchingBraceIndex !== -1) {
+      braceEnd = matchingBraceIndex + 1
     }
   }
 
-  colonIndex = findUnquotedChar(content, COLON, Math.max(bracketEnd, braceEnd))
+  // Without a field list the colon search would restart right after `]`.
+  const colonIndex = braceEnd === bracketEnd + 1
+    ? colonAfterBracket
+    : findUnquotedChar(content, COLON, braceEnd)
   if (colonIndex === -1) {
     return { kind: 'notHeader' }
   }
@@ -120,11 +142,11 @@ export function parseArrayHeaderLine(
 
   const { length, delimiter, keyed } = parsedBracket
 
-  let fields: FieldNode[] | undefined
+  let fields: readonly FieldNode[] | undefined
   if (braceStart !== -1 && braceStart < colonIndex) {
-    const foundBraceEnd = findMatchingBrace(content, braceStart)
-    if (foundBraceEnd !== -1 && foundBraceEnd < colonIndex) {
-      const fieldsContent = content.slice(braceStart + 1, foundBraceEnd)
+    // `colonIndex` never precedes `colonAfterBracket`, so the brace was matched above.
+    if (matchingBraceIndex !== -1 && matchingBraceIndex < colonIndex) {
+      const fieldsContent = content.slice(braceStart + 1, matchingBraceIndex)
 
       const mismatchedDelimiter = findUnquotedMismatchedDelimiter(fieldsContent, delimiter)
       if (mismatchedDelimiter !== undefined) {
@@ -135,7 +157,7 @@ export function parseArrayHeaderLine(
       }
 
       try {
-        fields = parseFieldEntries(fieldsContent, delimiter)
+        fields = parseCachedFieldEntries(fieldsContent, delimiter)
       }
       catch (error) {
         return { kind: 'invalid', reason: (error as Error).message }
@@ -247,13 +269,39 @@ export function parseFieldEntries(fieldsContent: string, delimiter: Delimiter):
   })
 }
 
+// Paginated results and repeated sections declare one schema many times, so a
+// field list's text is parsed once per delimiter. Decoding only reads a parsed
+// list, so every header with that text can share it; failed parses are not kept.
+const FIELD_LIST_CACHE_MAX_ENTRIES = 256
+const FIELD_LIST_CACHE_MAX_CONTENT_LENGTH = 1024
+const fieldListCache = new Map<string, readonly FieldNode[]>()
+
+function parseCachedFieldEntries(fieldsContent: string, delimiter: Delimiter): readonly FieldNode[] {
+  if (fieldsContent.length > FIELD_LIST_CACHE_MAX_CONTENT_LENGTH) {
+    return parseFieldEntries(fieldsContent, delimiter)
+  }
+
+  const cacheKey = delimiter + fieldsContent
+  let fields = fieldListCache.get(cacheKey)
+  if (fields === undefined) {
+    fields = parseFieldEntries(fieldsContent, delimiter)
+    if (fieldListCache.size >= FIELD_LIST_CACHE_MAX_ENTRIES) {
+      fieldListCache.clear()
+    }
+    fieldListCache.set(cacheKey, fields)
+  }
+
+  return fields
+}
+
 /**
  * Splits a field list on the active delimiter at brace depth zero,
  * respecting quoted names and escape sequences.
  */
 function splitFieldEntries(content: string, delimiter: Delimiter): string[] {
   const entries: string[] = []
-  let entryBuffer = ''
+  // Entries are sliced out of `content` by offset, never accumulated char by char.
+  let entryStart = 0
   let inQuotes = false
   let braceDepth = 0
   let i = 0
@@ -262,19 +310,14 @@ function splitFieldEntries(content: string, delimiter: Delimiter): string[] {
     const char = content[i]!
 
     if (char === BACKSLASH && i + 1 < content.length && inQuotes) {
-      entryBuffer += char + content[i + 1]
       i += 2
       continue
     }
 
     if (char === DOUBLE_QUOTE) {
       inQuotes = !inQuotes
-      entryBuffer += char
-      i++
-      continue
     }
-
-    if (!inQuotes) {
+    else if (!inQuotes) {
       if (char === OPEN_BRACE) {
         braceDepth++
       }
@@ -282,18 +325,15 @@ function splitFieldEntries(content: string, delimiter: Delimiter): string[] {
         braceDepth--
       }
       else if (char === delimiter && braceDepth === 0) {
-        entries.push(entryBuffer)
-        entryBuffer = ''
-        i++
-        continue
+        entries.push(content.slice(entryStart, i))
+        entryStart = i + 1
       }
     }
 
-    entryBuffer += char
     i++
   }
 
-  entries.push(entryBuffer)
+  entries.push(content.slice(entryStart))
   return entries
 }
 
@@ -391,41 +431,43 @@ function formatDelimiter(delimiter: Delimiter): string {
 /** Parses a delimited string into values, respecting quoted strings and escape sequences. */
 export function parseDelimitedValues(input: string, delimiter: Delimiter): string[] {
   const values: string[] = []
-  let valueBuffer = ''
-  let inQuotes = false
-  let i = 0
+  if (!input) {
+    return values
+  }
 
-  while (i < input.length) {
-    const char = input[i]
+  // Backslashes only escape inside quotes, so a quote-free row – the common tabular
+  // case – splits on every delimiter.
+  if (!input.includes(DOUBLE_QUOTE)) {
+    return input.split(delimiter).map(trimSpaces)
+  }
 
-    if (char === BACKSLASH && i + 1 < input.length && inQuotes) {
-      valueBuffer += char + input[i + 1]
-      i += 2
-      continue
-    }
+  // Jumps between structural positions with native `indexOf` instead of visiting every
+  // character: a quote before the next delimiter skips its whole quoted span at once.
+  let valueStart = 0
+  let quoteIndex = input.indexOf(DOUBLE_QUOTE)
+  let delimiterIndex = input.indexOf(delimiter)
 
-    if (char === DOUBLE_QUOTE) {
-      inQuotes = !inQuotes
-      valueBuffer += char
-      i++
-      continue
-    }
+  while (delimiterIndex !== -1) {
+    if (quoteIndex !== -1 && quoteIndex < delimiterIndex) {
+      const closingQuoteIndex = findClosingQuote(input, quoteIndex)
+      // An unterminated quote runs to the end of the input, hiding every later delimiter.
+      if (closingQuoteIndex === -1) {
+        break
+      }
 
-    if (char === delimiter && !inQuotes) {
-      values.push(trimSpaces(valueBuffer))
-      valueBuffer = ''
-      i++
+      quoteIndex = input.indexOf(DOUBLE_QUOTE, closingQuoteIndex + 1)
+      if (delimiterIndex < closingQuoteIndex) {
+        delimiterIndex = input.indexOf(delimiter, closingQuoteIndex + 1)
+      }
       continue
     }
 
-    valueBuffer += char
-    i++
-  }
-
-  if (valueBuffer || values.length > 0) {
-    values.push(trimSpaces(valueBuffer))
+    values.push(trimSpaces(input.slice(valueStart, delimiterIndex)))
+    valueStart = delimiterIndex + 1
+    delimiterIndex = input.indexOf(delimiter, valueStart)
   }
 
+  values.push(trimSpaces(input.slice(valueStart)))
   return values
 }
 
@@ -437,6 +479,30 @@ export function mapRowValuesToPrimitives(values: string[]): JsonPrimitive[] {
 
 // #region Primitive and key parsing
 
+// Which classifier a token's first character can match, indexed by char code.
+// Codes outside ASCII always start a plain string.
+const TOKEN_START_STRING = 0
+const TOKEN_START_QUOTE = 1
+const TOKEN_START_TRUE = 2
+const TOKEN_START_FALSE = 3
+const TOKEN_START_NULL = 4
+const TOKEN_START_NUMBER = 5
+
+const TOKEN_START_CLASSES = createTokenStartClasses()
+
+function createTokenStartClasses(): Uint8Array {
+  const classes = new Uint8Array(128)
+  classes[DOUBLE_QUOTE.charCodeAt(0)] = TOKEN_START_QUOTE
+  classes[TRUE_LITERAL.charCodeAt(0)] = TOKEN_START_TRUE
+  classes[FALSE_LITERAL.charCodeAt(0)] = TOKEN_START_FALSE
+  classes[NULL_LITERAL.charCodeAt(0)] = TOKEN_START_NULL
+  classes['-'.charCodeAt(0)] = TOKEN_START_NUMBER
+  for (let code = '0'.charCodeAt(0); code <= '9'.charCodeAt(0); code++) {
+    classes[code] = TOKEN_START_NUMBER
+  }
+  return classes
+}
+
 export function parsePrimitiveToken(token: string): JsonPrimitive {
   const trimmedToken = trimSpaces(token)
 
@@ -444,22 +510,27 @@ export function parsePrimitiveToken(token: string): JsonPrimitive {
     return ''
   }
 
-  if (trimmedToken.startsWith(DOUBLE_QUOTE)) {
-    return parseStringLiteral(trimmedToken)
-  }
-
-  if (isBooleanOrNullLiteral(trimmedToken)) {
-    if (trimmedToken === TRUE_LITERAL)
-      return true
-    if (trimmedToken === FALSE_LITERAL)
-      return false
-    if (trimmedToken === NULL_LITERAL)
-      return null
-  }
-
-  if (isNumericLiteral(trimmedToken)) {
-    const parsedNumber = Number.parseFloat(trimmedToken)
-    return Object.is(parsedNumber, -0) ? 0 : parsedNumber
+  // The first character already tells which classifier can match, so each token
+  // runs at most one of them instead of the whole cascade.
+  const firstCode = trimmedToken.charCodeAt(0)
+  const startClass = firstCode < 128 ? TOKEN_START_CLASSES[firstCode] : TOKEN_START_STRING
+
+  switch (startClass) {
+    case TOKEN_START_QUOTE:
+      return parseStringLiteral(trimmedToken)
+    case TOKEN_START_TRUE:
+      return trimmedToken === TRUE_LITERAL ? true : trimmedToken
+    case TOKEN_START_FALSE:
+      return trimmedToken === FALSE_LITERAL ? false : trimmedToken
+    case TOKEN_START_NULL:
+      return trimmedToken === NULL_LITERAL ? null : trimmedToken
+    case TOKEN_START_NUMBER: {
+      const parsedNumber = parseNumericLiteral(trimmedToken)
+      if (parsedNumber !== undefined) {
+        // Normalizes `-0` to `0`.
+        return parsedNumber === 0 ? 0 : parsedNumber
+      }
+    }
   }
 
   return trimmedToken
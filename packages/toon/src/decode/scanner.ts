@@ -1,14 +1,13 @@
-import type { BlankLineInfo, Depth, ParsedLine } from '../types.ts'
-import { BYTE_ORDER_MARK, CARRIAGE_RETURN, COMMENT_MARKER, SPACE, TAB } from '../constants.ts'
+import type { Depth, ParsedLine } from '../types.ts'
+import { BYTE_ORDER_MARK, CARRIAGE_RETURN, COMMENT_MARKER, LIST_ITEM_MARKER, LIST_ITEM_PREFIX, SPACE, TAB } from '../constants.ts'
 import { ToonDecodeError } from './errors.ts'
 
-const LEADING_WHITESPACE_PATTERN = /^[ \t]*/
-
 // #region Scan state
 
 export interface StreamingScanState {
   lineNumber: number
-  blankLines: BlankLineInfo[]
+  /** Line numbers of blank lines, in input order; recorded only in strict mode. */
+  blankLines: number[]
 }
 
 export function createScanState(): StreamingScanState {
@@ -40,16 +39,33 @@ export function parseLineIncremental(
     raw = raw.slice(0, -1)
   }
 
-  const leadingWhitespace = LEADING_WHITESPACE_PATTERN.exec(raw)![0]
-  const firstTabIndex = leadingWhitespace.indexOf(TAB)
+  // One pass over the leading spaces and tabs measures them and locates the tabs,
+  // without materializing the whitespace prefix.
+  let leadingWhitespaceLength = 0
+  let firstTabIndex = -1
+  let leadingTabCount = 0
+  while (leadingWhitespaceLength < raw.length) {
+    const char = raw[leadingWhitespaceLength]
+    if (char === TAB) {
+      if (firstTabIndex === -1) {
+        firstTabIndex = leadingWhitespaceLength
+      }
+      leadingTabCount++
+    }
+    else if (char !== SPACE) {
+      break
+    }
+    leadingWhitespaceLength++
+  }
 
   // Strict rejects tab indentation below, so only the spaces before the first tab are indentation there.
-  const indent = strict && firstTabIndex !== -1 ? firstTabIndex : leadingWhitespace.length
+  const indent = strict && firstTabIndex !== -1 ? firstTabIndex : leadingWhitespaceLength
   // Non-strict input may indent with tabs, and each tab counts as one depth level.
-  const tabIndent = strict || firstTabIndex === -1 ? 0 : leadingWhitespace.split(TAB).length - 1
+  const tabIndent = strict || firstTabIndex === -1 ? 0 : leadingTabCount
 
   // Without this, `- ` would be an item carrying an empty token instead of the bare list-item marker.
-  const content = trimTrailingSpaces(raw.slice(indent))
+  // Both ends are found first so the content is copied out of `raw` only once.
+  const content = raw.slice(indent, findTrailingSpacesStart(raw, indent))
 
   // Only spaces may precede the marker, so a tab in the indentation rules the line out.
   // Comment lines vanish before blank-line tracking and strict validation, so they
@@ -58,13 +74,16 @@ export function parseLineIncremental(
     return undefined
   }
 
-  const depth = computeDepthFromIndent(indent - tabIndent, indentSize) + tabIndent
-
   if (!content) {
-    state.blankLines.push({ lineNumber, indent, depth })
+    // Only strict mode rejects blank lines inside arrays, and it needs nothing but their positions.
+    if (strict) {
+      state.blankLines.push(lineNumber)
+    }
     return undefined
   }
 
+  const depth = computeDepthFromIndent(indent - tabIndent, indentSize) + tabIndent
+
   if (strict) {
     if (firstTabIndex !== -1) {
       throw new ToonDecodeError(
@@ -81,19 +100,24 @@ export function parseLineIncremental(
     }
   }
 
-  return { raw, indent, content, depth, lineNumber }
+  return { raw, indent, content, depth, lineNumber, isListItem: isListItemContent(content) }
+}
+
+/** Checks for the bare list-item marker or the list-item prefix. */
+export function isListItemContent(content: string): boolean {
+  return content[0] === LIST_ITEM_MARKER && (content.length === 1 || content.startsWith(LIST_ITEM_PREFIX))
 }
 
 function computeDepthFromIndent(indentSpaces: number, indentSize: number): Depth {
   return Math.floor(indentSpaces / indentSize)
 }
 
-function trimTrailingSpaces(value: string): string {
+function findTrailingSpacesStart(value: string, start: number): number {
   let end = value.length
-  while (end > 0 && value[end - 1] === SPACE) {
+  while (end > start && value[end - 1] === SPACE) {
     end--
   }
-  return end === value.length ? value : value.slice(0, end)
+  return end
 }
 
 // #endregion
@@ -1,4 +1,4 @@
-import type { ArrayHeaderInfo, BlankLineInfo, Delimiter, Depth, ParsedLine } from '../types.ts'
+import type { ArrayHeaderInfo, Delimiter, Depth, ParsedLine } from '../types.ts'
 import { COLON, LIST_ITEM_PREFIX } from '../constants.ts'
 import { findUnquotedChar } from '../shared/string-utils.ts'
 import { ToonDecodeError } from './errors.ts'
@@ -53,21 +53,29 @@ export function validateNoExtraTabularRows(
 export function validateNoBlankLinesInRange(
   startLine: number,
   endLine: number,
-  blankLines: BlankLineInfo[],
+  blankLines: readonly number[],
   strict: boolean,
   context: string,
 ): void {
   if (!strict)
     return
 
-  const firstBlank = blankLines.find(
-    blank => blank.lineNumber > startLine && blank.lineNumber < endLine,
-  )
+  // Blank lines are recorded in line order and the range just ended, so walking
+  // back from the newest one stops at the range start instead of rescanning
+  // every blank line of the document.
+  let firstBlankLine: number | undefined
+  for (let i = blankLines.length - 1; i >= 0; i--) {
+    const blankLine = blankLines[i]!
+    if (blankLine <= startLine)
+      break
+    if (blankLine < endLine)
+      firstBlankLine = blankLine
+  }
 
-  if (firstBlank) {
+  if (firstBlankLine !== undefined) {
     throw new ToonDecodeError(
       `Blank lines inside ${context} are not allowed in strict mode`,
-      { line: firstBlank.lineNumber },
+      { line: firstBlankLine },
     )
   }
 }
@@ -79,17 +87,19 @@ export function validateNoBlankLinesInRange(
 /** Checks if a line is a data row (vs a key-value pair) in a tabular array. */
 export function isDataRow(content: string, delimiter: Delimiter): boolean {
   const colonPos = findUnquotedChar(content, COLON)
-  const delimiterPos = findUnquotedChar(content, delimiter)
-
   if (colonPos === -1) {
     return true
   }
 
-  if (delimiterPos !== -1 && delimiterPos < colonPos) {
-    return true
+  // Only a delimiter ahead of the colon makes a data row, so the quote-aware
+  // delimiter scan runs only when one occurs there at all.
+  const firstDelimiterPos = content.indexOf(delimiter)
+  if (firstDelimiterPos === -1 || firstDelimiterPos > colonPos) {
+    return false
   }
 
-  return false
+  const delimiterPos = findUnquotedChar(content, delimiter)
+  return delimiterPos !== -1 && delimiterPos < colonPos
 }
 
 // #endregion
@@ -1,9 +1,15 @@
 import type { Depth, FieldNode, JsonArray, JsonObject, JsonValue, ResolvedEncodeOptions } from '../types.ts'
 import type { EncodablePrimitive } from './raw-string.ts'
 import { LIST_ITEM_MARKER, LIST_ITEM_PREFIX } from '../constants.ts'
-import { isArrayOfArrays, isArrayOfObjects, isArrayOfPrimitives, isEmptyObject, isEncodablePrimitive, isJsonArray, isJsonObject } from './normalize.ts'
+import { classifyArray, isArrayOfObjects, isArrayOfPrimitives, isEncodablePrimitive, isJsonArray, isJsonObject } from './normalize.ts'
 import { encodeAndJoinPrimitives, encodeKey, encodePrimitive, formatHeader } from './primitives.ts'
-import { collectRowLeaves, extractKeyedTabularFields, extractTabularFields } from './tabular.ts'
+import { compileRowEncoder, extractKeyedTabularFields, extractTabularFields } from './tabular.ts'
+
+interface ObjectLinesFrame {
+  entries: [string, JsonValue][]
+  index: number
+  depth: Depth
+}
 
 // #region Encode normalized JsonValue
 
@@ -28,7 +34,7 @@ export function* encodeJsonValue(value: JsonValue, options: ResolvedEncodeOption
       return
     }
 
-    yield* encodeObjectLines(value, depth, options)
+    yield* encodeObjectLines(Object.entries(value), depth, options)
   }
 }
 
@@ -37,39 +43,44 @@ export function* encodeJsonValue(value: JsonValue, options: ResolvedEncodeOption
 // #region Object encoding
 
 function* encodeObjectLines(
-  value: JsonObject,
+  entries: [string, JsonValue][],
   depth: Depth,
   options: ResolvedEncodeOptions,
+  startIndex = 0,
 ): Generator<string> {
-  for (const [key, val] of Object.entries(value)) {
-    yield* encodeKeyValuePairLines(key, val, depth, options)
-  }
-}
+  // Same frame stack as decodeObjectFields. Only plain nested objects get a
+  // frame; arrays and keyed tabular objects still delegate with `yield*`.
+  const frames: ObjectLinesFrame[] = [{ entries, index: startIndex, depth }]
+
+  while (frames.length > 0) {
+    const frame = frames[frames.length - 1]!
+    if (frame.index === frame.entries.length) {
+      frames.pop()
+      continue
+    }
 
-function* encodeKeyValuePairLines(
-  key: string,
-  value: JsonValue,
-  depth: Depth,
-  options: ResolvedEncodeOptions,
-): Generator<string> {
-  const encodedKey = encodeKey(key)
+    const [key, val] = frame.entries[frame.index++]!
+    const encodedKey = encodeKey(key)
 
-  if (isEncodablePrimitive(value)) {
-    yield indentedLine(depth, `${encodedKey}: ${encodePrimitive(value, options.delimiter)}`, options.indentSize)
-  }
-  else if (isJsonArray(value)) {
-    yield* encodeArrayLines(key, value, depth, options)
-  }
-  else if (isJsonObject(value)) {
-    const keyedFields = extractKeyedTabularFields(value)
-    if (keyedFields) {
-      yield* encodeKeyedObjectLines(key, value, keyedFields, depth, options)
-      return
+    if (isEncodablePrimitive(val)) {
+      yield indentedLine(frame.depth, `${encodedKey}: ${encodePrimitive(val, options.delimiter)}`, options.indentSize)
+    }
+    else if (isJsonArray(val)) {
+      yield* encodeArrayLines(key, val, frame.depth, options)
     }
+    else if (isJsonObject(val)) {
+      const keyedFields = extractKeyedTabularFields(val)
+      if (keyedFields) {
+        yield* encodeKeyedObjectLines(key, val, keyedFields, frame.depth, options)
+        continue
+      }
 
-    yield indentedLine(depth, `${encodedKey}:`, options.indentSize)
-    if (!isEmptyObject(value)) {
-      yield* encodeObjectLines(value, depth + 1, options)
+      yield indentedLine(frame.depth, `${encodedKey}:`, options.indentSize)
+      // An empty object's frame would pop at once, so its entries double as the emptiness test.
+      const nestedEntries = Object.entries(val)
+      if (nestedEntries.length > 0) {
+        frames.push({ entries: nestedEntries, index: 0, depth: frame.depth + 1 })
+      }
     }
   }
 }
@@ -97,9 +108,10 @@ function* encodeKeyedEntryRowsLines(
   depth: Depth,
   options: ResolvedEncodeOptions,
 ): Generator<string> {
+  const indentation = indentationFor(depth * options.indentSize)
+  const encodeRow = compileRowEncoder(fields, options.delimiter)
   for (const [entryKey, entryValue] of entries) {
-    const leaves = collectRowLeaves(entryValue as JsonObject, fields)
-    yield indentedLine(depth, `${encodeKey(entryKey)}: ${encodeAndJoinPrimitives(leaves, options.delimiter)}`, options.indentSize)
+    yield `${indentation}${encodeKey(entryKey)}: ${encodeRow(entryValue as JsonObject)}`
   }
 }
 
@@ -119,29 +131,23 @@ function* encodeArrayLines(
     return
   }
 
-  if (isArrayOfPrimitives(value)) {
-    const arrayLine = encodeInlineArrayLine(value, options.delimiter, key)
-    yield indentedLine(depth, arrayLine, options.indentSize)
-    return
-  }
-
-  if (isArrayOfArrays(value)) {
-    const allPrimitiveArrays = value.every(arr => isArrayOfPrimitives(arr))
-    if (allPrimitiveArrays) {
-      yield* encodeArrayOfArraysAsListItemsLines(key, value, depth, options)
+  switch (classifyArray(value)) {
+    case 'primitives': {
+      const arrayLine = encodeInlineArrayLine(value as readonly EncodablePrimitive[], options.delimiter, key)
+      yield indentedLine(depth, arrayLine, options.indentSize)
       return
     }
-  }
-
-  if (isArrayOfObjects(value)) {
-    const fields = extractTabularFields(value)
-    if (fields) {
-      yield* encodeArrayOfObjectsAsTabularLines(key, value, fields, depth, options)
-    }
-    else {
-      yield* encodeMixedArrayAsListItemsLines(key, value, depth, options)
+    case 'primitiveArrays':
+      yield* encodeArrayOfArraysAsListItemsLines(key, value as readonly (readonly EncodablePrimitive[])[], depth, options)
+      return
+    case 'objects': {
+      const fields = extractTabularFields(value as readonly JsonObject[])
+      if (fields) {
+        yield* encodeArrayOfObjectsAsTabularLines(key, value as readonly JsonObject[], fields, depth, options)
+        return
+      }
+      break
     }
-    return
   }
 
   yield* encodeMixedArrayAsListItemsLines(key, value, depth, options)
@@ -153,7 +159,7 @@ function* encodeArrayLines(
 
 function* encodeArrayOfArraysAsListItemsLines(
   prefix: string | undefined,
-  values: readonly JsonArray[],
+  values: readonly (readonly EncodablePrimitive[])[],
   depth: Depth,
   options: ResolvedEncodeOptions,
 ): Generator<string> {
@@ -161,10 +167,8 @@ function* encodeArrayOfArraysAsListItemsLines(
   yield indentedLine(depth, header, options.indentSize)
 
   for (const arr of values) {
-    if (isArrayOfPrimitives(arr)) {
-      const arrayLine = encodeInlineArrayLine(arr, options.delimiter)
-      yield indentedListItem(depth + 1, arrayLine, options.indentSize)
-    }
+    const arrayLine = encodeInlineArrayLine(arr, options.delimiter)
+    yield indentedListItem(depth + 1, arrayLine, options.indentSize)
   }
 }
 
@@ -201,9 +205,11 @@ function* writeTabularRowsLines(
   depth: Depth,
   options: ResolvedEncodeOptions,
 ): Generator<string> {
+  // Every row shares one depth, so its indentation is resolved once per table.
+  const indentation = indentationFor(depth * options.indentSize)
+  const encodeRow = compileRowEncoder(fields, options.delimiter)
   for (const row of rows) {
-    const leaves = collectRowLeaves(row, fields)
-    yield indentedLine(depth, encodeAndJoinPrimitives(leaves, options.delimiter), options.indentSize)
+    yield indentation + encodeRow(row)
   }
 }
 
@@ -230,14 +236,13 @@ function* encodeObjectAsListItemLines(
   depth: Depth,
   options: ResolvedEncodeOptions,
 ): Generator<string> {
-  if (isEmptyObject(obj)) {
+  const entries = Object.entries(obj)
+  if (entries.length === 0) {
     yield indentedLine(depth, LIST_ITEM_MARKER, options.indentSize)
     return
   }
 
-  const entries = Object.entries(obj)
   const [firstKey, firstValue] = entries[0]!
-  const restEntries = entries.slice(1)
 
   if (isJsonArray(firstValue) && isArrayOfObjects(firstValue)) {
     const fields = extractTabularFields(firstValue)
@@ -246,10 +251,7 @@ function* encodeObjectAsListItemLines(
       yield indentedListItem(depth, header, options.indentSize)
       yield* writeTabularRowsLines(firstValue, fields, depth + 2, options)
 
-      if (restEntries.length > 0) {
-        const restObj: JsonObject = Object.fromEntries(restEntries)
-        yield* encodeObjectLines(restObj, depth + 1, options)
-      }
+      yield* encodeObjectLines(entries, depth + 1, options, 1)
       return
     }
   }
@@ -263,10 +265,7 @@ function* encodeObjectAsListItemLines(
       yield indentedListItem(depth, header, options.indentSize)
       yield* encodeKeyedEntryRowsLines(keyedEntries, keyedFields, depth + 2, options)
 
-      if (restEntries.length > 0) {
-        const restObj: JsonObject = Object.fromEntries(restEntries)
-        yield* encodeObjectLines(restObj, depth + 1, options)
-      }
+      yield* encodeObjectLines(entries, depth + 1, options, 1)
       return
     }
   }
@@ -297,15 +296,11 @@ function* encodeObjectAsListItemLines(
   }
   else if (isJsonObject(firstValue)) {
     yield indentedListItem(depth, `${encodedKey}:`, options.indentSize)
-    if (!isEmptyObject(firstValue)) {
-      yield* encodeObjectLines(firstValue, depth + 2, options)
-    }
+    yield* encodeObjectLines(Object.entries(firstValue), depth + 2, options)
   }
 
-  if (restEntries.length > 0) {
-    const restObj: JsonObject = Object.fromEntries(restEntries)
-    yield* encodeObjectLines(restObj, depth + 1, options)
-  }
+  // Sibling fields follow at depth + 1, read straight from the item's entries.
+  yield* encodeObjectLines(entries, depth + 1, options, 1)
 }
 
 // #endregion
@@ -342,13 +337,47 @@ function* encodeListItemValueLines(
 
 // #region Indentation helpers
 
+// Every line at a given depth repeats the same indentation, so each width is
+// built once. Widths past the cap are rare enough to build per line.
+const INDENTATION_CACHE_MAX_WIDTH = 256
+const indentationCache: string[] = []
+
 function indentedLine(depth: Depth, content: string, indentSize: number): string {
-  const indentation = ' '.repeat(indentSize * depth)
-  return indentation + content
+  const width = indentSize * depth
+  if (width === 0) {
+    return content
+  }
+
+  return indentationFor(width) + content
+}
+
+function indentationFor(width: number): string {
+  let indentation = indentationCache[width]
+  if (indentation === undefined) {
+    indentation = ' '.repeat(width)
+    if (width <= INDENTATION_CACHE_MAX_WIDTH) {
+      indentationCache[width] = indentation
+    }
+  }
+
+  return indentation
 }
 
+// The indentation and `- ` are joined once per width, so each item line takes a
+// single concatenation with its content.
+const listItemPrefixCache: string[] = []
+
 function indentedListItem(depth: Depth, content: string, indentSize: number): string {
-  return indentedLine(depth, LIST_ITEM_PREFIX + content, indentSize)
+  const width = indentSize * depth
+  let prefix = listItemPrefixCache[width]
+  if (prefix === undefined) {
+    prefix = indentedLine(depth, LIST_ITEM_PREFIX, indentSize)
+    if (width <= INDENTATION_CACHE_MAX_WIDTH) {
+      listItemPrefixCache[width] = prefix
+    }
+  }
+
+  return prefix + content
 }
 
 // #endregion
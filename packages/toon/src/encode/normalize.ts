@@ -8,6 +8,27 @@ const SURROGATE_PATTERN = /[\uD800-\uDFFF]/
 // #region Normalization (unknown → JsonValue)
 
 export function normalizeValue(value: unknown): JsonValue {
+  // JSON-shaped input is mostly primitives, and none of them can carry the
+  // `toJSON` hook or a host type below, so they are settled by `typeof` first.
+  if (typeof value === 'string') {
+    assertNoLoneSurrogate(value, 'string value')
+    return value
+  }
+
+  if (typeof value === 'number') {
+    if (Object.is(value, -0)) {
+      return 0
+    }
+    if (!Number.isFinite(value)) {
+      return null
+    }
+    return value
+  }
+
+  if (typeof value === 'boolean') {
+    return value
+  }
+
   if (value === null) {
     return null
   }
@@ -31,25 +52,6 @@ export function normalizeValue(value: unknown): JsonValue {
     }
   }
 
-  if (typeof value === 'string') {
-    assertNoLoneSurrogate(value, 'string value')
-    return value
-  }
-
-  if (typeof value === 'boolean') {
-    return value
-  }
-
-  if (typeof value === 'number') {
-    if (Object.is(value, -0)) {
-      return 0
-    }
-    if (!Number.isFinite(value)) {
-      return null
-    }
-    return value
-  }
-
   if (typeof value === 'bigint') {
     if (value >= Number.MIN_SAFE_INTEGER && value <= Number.MAX_SAFE_INTEGER) {
       return Number(value)
@@ -121,16 +123,18 @@ function assertNoLoneSurrogate(value: string, context: string): void {
 // #region Type guards
 
 export function isJsonPrimitive(value: unknown): value is JsonPrimitive {
-  return (
-    value === null
-    || typeof value === 'string'
-    || typeof value === 'number'
-    || typeof value === 'boolean'
-  )
+  const valueType = typeof value
+  return valueType === 'string' || valueType === 'number' || valueType === 'boolean' || value === null
 }
 
+// The encoder asks this of every value it visits, so one `typeof` decides it for
+// everything but objects, which are primitives only as `null` or a raw string.
 export function isEncodablePrimitive(value: unknown): value is EncodablePrimitive {
-  return isJsonPrimitive(value) || isRawString(value)
+  const valueType = typeof value
+  if (valueType === 'object') {
+    return value === null || isRawString(value)
+  }
+  return valueType === 'string' || valueType === 'number' || valueType === 'boolean'
 }
 
 export function isJsonArray(value: unknown): value is JsonArray {
@@ -162,12 +166,40 @@ export function isArrayOfPrimitives(value: JsonArray | readonly EncodablePrimiti
   return value.length === 0 || value.every(item => isEncodablePrimitive(item))
 }
 
-export function isArrayOfArrays(value: JsonArray): value is readonly JsonArray[] {
-  return value.length === 0 || value.every(item => isJsonArray(item))
-}
-
 export function isArrayOfObjects(value: JsonArray): value is readonly JsonObject[] {
   return value.length === 0 || value.every(item => isJsonObject(item))
 }
 
+/**
+ * How an array's items let it be encoded: all primitives, all arrays of primitives,
+ * all objects, or anything else.
+ */
+export type ArrayKind = 'primitives' | 'primitiveArrays' | 'objects' | 'mixed'
+
+/**
+ * Classifies an array in one pass: the first item names the only kind the array
+ * can have, and the rest only confirm it.
+ */
+export function classifyArray(value: JsonArray): ArrayKind {
+  if (value.length === 0) {
+    return 'primitives'
+  }
+
+  const first = value[0]
+  if (isEncodablePrimitive(first)) {
+    return isArrayOfPrimitives(value) ? 'primitives' : 'mixed'
+  }
+
+  if (isJsonArray(first)) {
+    for (const item of value) {
+      if (!isJsonArray(item) || !isArrayOfPrimitives(item)) {
+        return 'mixed'
+      }
+    }
+    return 'primitiveArrays'
+  }
+
+  return isArrayOfObjects(value) ? 'objects' : 'mixed'
+}
+
 // #endregion
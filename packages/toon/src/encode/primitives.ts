@@ -1,30 +1,31 @@
 import type { FieldNode } from '../types.ts'
 import type { EncodablePrimitive } from './raw-string.ts'
-import { COMMA, DEFAULT_DELIMITER, DOUBLE_QUOTE, NULL_LITERAL } from '../constants.ts'
+import { COMMA, DEFAULT_DELIMITER, DOUBLE_QUOTE, FALSE_LITERAL, NULL_LITERAL, TRUE_LITERAL } from '../constants.ts'
 import { escapeString } from '../shared/string-utils.ts'
 import { isSafeUnquoted, isValidUnquotedKey } from '../shared/validation.ts'
-import { isRawString } from './raw-string.ts'
 
 // #region Primitive encoding
 
 export function encodePrimitive(value: EncodablePrimitive, delimiter?: string): string {
-  if (isRawString(value)) {
-    return value.value
+  // Ordered by frequency in real payloads: strings dominate, then numbers.
+  // Only `null` and `RawString` remain once the `typeof` checks fall through.
+  if (typeof value === 'string') {
+    return encodeStringLiteral(value, delimiter)
   }
 
-  if (value === null) {
-    return NULL_LITERAL
+  if (typeof value === 'number') {
+    return String(value)
   }
 
   if (typeof value === 'boolean') {
-    return String(value)
+    return value ? TRUE_LITERAL : FALSE_LITERAL
   }
 
-  if (typeof value === 'number') {
-    return String(value)
+  if (value === null) {
+    return NULL_LITERAL
   }
 
-  return encodeStringLiteral(value, delimiter)
+  return value.value
 }
 
 export function encodeStringLiteral(value: string, delimiter: string = DEFAULT_DELIMITER): string {
@@ -1,6 +1,7 @@
 import type { FieldNode, JsonObject, JsonValue } from '../types.ts'
 import type { EncodablePrimitive } from './raw-string.ts'
 import { isEmptyObject, isEncodablePrimitive, isJsonObject } from './normalize.ts'
+import { encodePrimitive } from './primitives.ts'
 
 /** Classifies rows into a tabular field list, or undefined when they are not uniformly tabular. */
 export function extractTabularFields(rows: readonly JsonObject[]): FieldNode[] | undefined {
@@ -26,7 +27,7 @@ export function extractTabularFields(rows: readonly JsonObject[]): FieldNode[] |
 
   const fieldNodes: FieldNode[] = []
   for (const key of firstKeys) {
-    const fieldNode = classifyColumn(key, rows.map(row => row[key]!))
+    const fieldNode = classifyColumn(key, rows)
     if (!fieldNode) {
       return
     }
@@ -44,32 +45,67 @@ export function extractKeyedTabularFields(value: JsonObject): FieldNode[] | unde
     return
   }
 
-  if (!entryValues.every(entryValue => isJsonObject(entryValue) && !isEmptyObject(entryValue))) {
-    return
+  for (const entryValue of entryValues) {
+    if (!isJsonObject(entryValue) || isEmptyObject(entryValue)) {
+      return
+    }
   }
 
   return extractTabularFields(entryValues as JsonObject[])
 }
 
-/** Reads one row's leaf cells in the field order `extractTabularFields` produced. */
-export function collectRowLeaves(row: JsonObject, fields: readonly FieldNode[]): EncodablePrimitive[] {
-  const leaves: EncodablePrimitive[] = []
-  collectLeafValues(row, fields, leaves)
-  return leaves
+/**
+ * Compiles one header's field tree into the encoder for its rows' cell text.
+ * Every row of a table shares the header, so each leaf's key path is resolved
+ * once here rather than by walking the field tree per row.
+ */
+export function compileRowEncoder(fields: readonly FieldNode[], delimiter: string): (row: JsonObject) => string {
+  const leafPaths: string[][] = []
+  collectLeafPaths(fields, [], leafPaths)
+
+  // The cell buffer is reused across rows, since `join` copies it out.
+  const cells: string[] = Array.from({ length: leafPaths.length })
+
+  return (row) => {
+    for (let index = 0; index < leafPaths.length; index++) {
+      const path = leafPaths[index]!
+      let value = row[path[0]!] as JsonValue
+      for (let depth = 1; depth < path.length; depth++) {
+        value = (value as JsonObject)[path[depth]!] as JsonValue
+      }
+      cells[index] = encodePrimitive(value as EncodablePrimitive, delimiter)
+    }
+
+    return cells.join(delimiter)
+  }
 }
 
-function classifyColumn(name: string, values: readonly JsonValue[]): FieldNode | undefined {
-  // Uniform-primitive column: a bare leaf field.
-  if (values.every(value => isEncodablePrimitive(value))) {
+function classifyColumn(name: string, rows: readonly JsonObject[]): FieldNode | undefined {
+  // Uniform-primitive column: a bare leaf field. Checked in place, since most
+  // columns are primitive and never need their values gathered.
+  let isPrimitiveColumn = true
+  for (const row of rows) {
+    if (!isEncodablePrimitive(row[name])) {
+      isPrimitiveColumn = false
+      break
+    }
+  }
+
+  if (isPrimitiveColumn) {
     return { name }
   }
 
   // Nested-uniform column: non-empty objects sharing one key set, classified recursively.
-  if (!values.every(value => isJsonObject(value) && !isEmptyObject(value))) {
-    return
+  const values: JsonObject[] = []
+  for (const row of rows) {
+    const value = row[name]
+    if (!isJsonObject(value) || isEmptyObject(value)) {
+      return
+    }
+    values.push(value)
   }
 
-  const children = extractTabularFields(values as JsonObject[])
+  const children = extractTabularFields(values)
   if (!children) {
     return
   }
@@ -77,14 +113,14 @@ function classifyColumn(name: string, values: readonly JsonValue[]): FieldNode |
   return { name, children }
 }
 
-function collectLeafValues(row: JsonObject, fields: readonly FieldNode[], leaves: EncodablePrimitive[]): void {
+function collectLeafPaths(fields: readonly FieldNode[], parentPath: readonly string[], leafPaths: string[][]): void {
   for (const field of fields) {
-    const value = row[field.name]
+    const path = [...parentPath, field.name]
     if (field.children) {
-      collectLeafValues(value as JsonObject, field.children, leaves)
+      collectLeafPaths(field.children, path, leafPaths)
     }
     else {
-      leaves.push(value as EncodablePrimitive)
+      leafPaths.push(path)
     }
   }
 }
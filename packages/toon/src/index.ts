@@ -198,7 +198,24 @@ export function decodeStream(
   return decodeStreamCore(source, options)
 }
 
+// Most calls pass no options; they share one frozen resolution instead of
+// building (and validating) a fresh one per call.
+const DEFAULT_RESOLVED_ENCODE_OPTIONS: ResolvedEncodeOptions = Object.freeze({
+  indentSize: 2,
+  delimiter: DEFAULT_DELIMITER,
+  replacer: undefined,
+})
+
+const DEFAULT_RESOLVED_DECODE_OPTIONS: ResolvedDecodeOptions = Object.freeze({
+  indentSize: 2,
+  strict: true,
+})
+
 function resolveOptions(options?: EncodeOptions): ResolvedEncodeOptions {
+  if (options === undefined) {
+    return DEFAULT_RESOLVED_ENCODE_OPTIONS
+  }
+
   const delimiter = options?.delimiter ?? DEFAULT_DELIMITER
   assertValidDelimiter(delimiter)
 
@@ -210,6 +227,10 @@ function resolveOptions(options?: EncodeOptions): ResolvedEncodeOptions {
 }
 
 function resolveDecodeOptions(options?: DecodeOptions): ResolvedDecodeOptions {
+  if (options === undefined) {
+    return DEFAULT_RESOLVED_DECODE_OPTIONS
+  }
+
   return {
     indentSize: options?.indentSize ?? options?.indent ?? 2,
     strict: options?.strict ?? true,
@@ -7,18 +7,22 @@ export function isBooleanOrNullLiteral(token: string): boolean {
 }
 
 /**
- * Checks if a token represents a valid numeric literal.
+ * Parses a token that represents a valid numeric literal.
  *
  * @remarks
  * Rejects numbers with leading zeros (except `"0"` itself or decimals like `"0.5"`).
+ * The grammar check is what rejects forms `Number` accepts (`0x1F`, `1.`, ` 1`),
+ * so the one conversion serves as both the range check and the result.
+ *
+ * @returns The finite number the token denotes, or `undefined` if it is not a numeric literal
  */
-export function isNumericLiteral(token: string): boolean {
+export function parseNumericLiteral(token: string): number | undefined {
   if (!token)
-    return false
+    return undefined
 
   if (!NUMERIC_LITERAL_PATTERN.test(token))
-    return false
+    return undefined
 
   const numericValue = Number(token)
-  return !Number.isNaN(numericValue) && Number.isFinite(numericValue)
+  return Number.isFinite(numericValue) ? numericValue : undefined
 }
@@ -22,6 +22,23 @@ export function trimSpaces(value: string): string {
   return start === 0 && end === value.length ? value : value.slice(start, end)
 }
 
+// eslint-disable-next-line no-control-regex
+const ESCAPABLE_CHAR_PATTERN = /[\\"\u0000-\u001F]/
+// eslint-disable-next-line no-control-regex
+const ESCAPABLE_CHARS_PATTERN = /[\\"\u0000-\u001F]/g
+
+const SHORT_ESCAPES: Readonly<Record<string, string>> = {
+  [BACKSLASH]: `${BACKSLASH}${BACKSLASH}`,
+  [DOUBLE_QUOTE]: `${BACKSLASH}${DOUBLE_QUOTE}`,
+  [NEWLINE]: `${BACKSLASH}n`,
+  [CARRIAGE_RETURN]: `${BACKSLASH}r`,
+  [TAB]: `${BACKSLASH}t`,
+}
+
+function escapeChar(char: string): string {
+  return SHORT_ESCAPES[char] ?? `${BACKSLASH}u${char.charCodeAt(0).toString(16).padStart(4, '0')}`
+}
+
 /**
  * Escapes special characters in a string for encoding.
  *
@@ -29,16 +46,24 @@ export function trimSpaces(value: string): string {
  * Control characters outside `\n`, `\r`, `\t`, `\\`, and `"` are emitted as `\uXXXX`.
  */
 export function escapeString(value: string): string {
-  return value
-    .replace(/\\/g, `${BACKSLASH}${BACKSLASH}`)
-    .replace(/"/g, `${BACKSLASH}${DOUBLE_QUOTE}`)
-    .replace(/\n/g, `${BACKSLASH}n`)
-    .replace(/\r/g, `${BACKSLASH}r`)
-    .replace(/\t/g, `${BACKSLASH}t`)
-    // eslint-disable-next-line no-control-regex
-    .replace(/[\u0000-\u001F]/g, c => `${BACKSLASH}u${c.charCodeAt(0).toString(16).padStart(4, '0')}`)
+  // Most strings need no escaping; one test spares them the replace pass.
+  if (!ESCAPABLE_CHAR_PATTERN.test(value)) {
+    return value
+  }
+
+  return value.replace(ESCAPABLE_CHARS_PATTERN, escapeChar)
 }
 
+const SHORT_UNESCAPES: ReadonlyMap<string, string> = new Map([
+  ['n', NEWLINE],
+  ['t', TAB],
+  ['r', CARRIAGE_RETURN],
+  [BACKSLASH, BACKSLASH],
+  [DOUBLE_QUOTE, DOUBLE_QUOTE],
+])
+
+const HEX_ESCAPE_PATTERN = /^[0-9a-f]{4}$/i
+
 /**
  * Unescapes a string by processing escape sequences.
  *
@@ -46,107 +71,97 @@ export function escapeString(value: string): string {
  * Lone surrogates in `\uXXXX` escapes are rejected.
  */
 export function unescapeString(value: string): string {
+  // Copies the clean spans between backslashes in bulk; most strings have none.
+  let backslashIndex = value.indexOf(BACKSLASH)
+  if (backslashIndex === -1) {
+    return value
+  }
+
   let unescaped = ''
-  let i = 0
+  let spanStart = 0
 
-  while (i < value.length) {
-    if (value[i] === BACKSLASH) {
-      if (i + 1 >= value.length) {
-        throw new SyntaxError('Invalid escape sequence: backslash at end of string')
-      }
+  while (backslashIndex !== -1) {
+    unescaped += value.slice(spanStart, backslashIndex)
 
-      const next = value[i + 1]
-      if (next === 'n') {
-        unescaped += NEWLINE
-        i += 2
-        continue
-      }
-      if (next === 't') {
-        unescaped += TAB
-        i += 2
-        continue
-      }
-      if (next === 'r') {
-        unescaped += CARRIAGE_RETURN
-        i += 2
-        continue
-      }
-      if (next === BACKSLASH) {
-        unescaped += BACKSLASH
-        i += 2
-        continue
+    if (backslashIndex + 1 >= value.length) {
+      throw new SyntaxError('Invalid escape sequence: backslash at end of string')
+    }
+
+    const next = value[backslashIndex + 1]!
+    const shortUnescape = SHORT_UNESCAPES.get(next)
+
+    if (shortUnescape !== undefined) {
+      unescaped += shortUnescape
+      spanStart = backslashIndex + 2
+    }
+    else if (next === 'u') {
+      if (backslashIndex + 6 > value.length) {
+        throw new SyntaxError(`Invalid escape sequence: truncated \\u escape at "${value.slice(backslashIndex, backslashIndex + 6)}"`)
       }
-      if (next === DOUBLE_QUOTE) {
-        unescaped += DOUBLE_QUOTE
-        i += 2
-        continue
+      const hex = value.slice(backslashIndex + 2, backslashIndex + 6)
+      if (!HEX_ESCAPE_PATTERN.test(hex)) {
+        throw new SyntaxError(`Invalid escape sequence: \\u must be followed by 4 hex digits, got "${hex}"`)
       }
-      if (next === 'u') {
-        if (i + 6 > value.length) {
-          throw new SyntaxError(`Invalid escape sequence: truncated \\u escape at "${value.slice(i, i + 6)}"`)
-        }
-        const hex = value.slice(i + 2, i + 6)
-        if (!/^[0-9a-f]{4}$/i.test(hex)) {
-          throw new SyntaxError(`Invalid escape sequence: \\u must be followed by 4 hex digits, got "${hex}"`)
-        }
-        const codeUnit = Number.parseInt(hex, 16)
-        if (codeUnit >= 0xD800 && codeUnit <= 0xDFFF) {
-          throw new SyntaxError(`Invalid escape sequence: \\u${hex} is a lone surrogate. Supplementary code points MUST appear as literal UTF-8`)
-        }
-        unescaped += String.fromCodePoint(codeUnit)
-        i += 6
-        continue
+      const codeUnit = Number.parseInt(hex, 16)
+      if (codeUnit >= 0xD800 && codeUnit <= 0xDFFF) {
+        throw new SyntaxError(`Invalid escape sequence: \\u${hex} is a lone surrogate. Supplementary code points MUST appear as literal UTF-8`)
       }
-
+      unescaped += String.fromCodePoint(codeUnit)
+      spanStart = backslashIndex + 6
+    }
+    else {
       throw new SyntaxError(`Invalid escape sequence: \\${next}`)
     }
 
-    unescaped += value[i]
-    i++
+    backslashIndex = value.indexOf(BACKSLASH, spanStart)
   }
 
-  return unescaped
+  return unescaped + value.slice(spanStart)
 }
 
 /** Finds the index of the closing double quote, accounting for escape sequences. */
 export function findClosingQuote(content: string, start: number): number {
-  let i = start + 1
-  while (i < content.length) {
-    if (content[i] === BACKSLASH && i + 1 < content.length) {
-      i += 2
-      continue
+  let quoteIndex = content.indexOf(DOUBLE_QUOTE, start + 1)
+
+  while (quoteIndex !== -1) {
+    // Escapes pair up left to right, so an odd run of backslashes right before a
+    // quote escapes it, while an even run only escapes itself.
+    let backslashCount = 0
+    while (quoteIndex - backslashCount - 1 > start && content[quoteIndex - backslashCount - 1] === BACKSLASH) {
+      backslashCount++
     }
-    if (content[i] === DOUBLE_QUOTE) {
-      return i
+
+    if (backslashCount % 2 === 0) {
+      return quoteIndex
     }
-    i++
+
+    quoteIndex = content.indexOf(DOUBLE_QUOTE, quoteIndex + 1)
   }
+
   return -1
 }
 
 /** Finds the index of a character outside of quoted sections. */
 export function findUnquotedChar(content: string, char: string, start = 0): number {
-  let inQuotes = false
-  let i = start
-
-  while (i < content.length) {
-    if (content[i] === BACKSLASH && i + 1 < content.length && inQuotes) {
-      i += 2
-      continue
+  // Jumps with native `indexOf`: a candidate before the next quote is unquoted, and
+  // a quote before it skips its whole quoted span. Quote-free content – the common
+  // case – costs two searches.
+  let searchStart = start
+  let quoteIndex = content.indexOf(DOUBLE_QUOTE, searchStart)
+
+  while (true) {
+    const charIndex = content.indexOf(char, searchStart)
+    if (charIndex === -1 || quoteIndex === -1 || charIndex < quoteIndex) {
+      return charIndex
     }
 
-    if (content[i] === DOUBLE_QUOTE) {
-      inQuotes = !inQuotes
-      i++
-      continue
+    const closingQuoteIndex = findClosingQuote(content, quoteIndex)
+    // An unterminated quote runs to the end of the content.
+    if (closingQuoteIndex === -1) {
+      return -1
     }
 
-    if (content[i] === char && !inQuotes) {
-      return i
-    }
-
-    i++
+    searchStart = closingQuoteIndex + 1
+    quoteIndex = content.indexOf(DOUBLE_QUOTE, searchStart)
   }
-
-  return -1
 }
@@ -1,12 +1,51 @@
 import type { Delimiter } from '../types.ts'
-import { COMMENT_MARKER, DEFAULT_DELIMITER, DELIMITERS, LIST_ITEM_MARKER } from '../constants.ts'
+import { COMMA, COMMENT_MARKER, DEFAULT_DELIMITER, DELIMITERS, LIST_ITEM_MARKER, PIPE, SPACE, TAB } from '../constants.ts'
 import { isBooleanOrNullLiteral } from './literal-utils.ts'
 
 const NUMERIC_LIKE_PATTERN = /^[+-]?\d+(?:\.\d+)?(?:e[+-]?\d+)?$/i
 
+// Colons, quotes, backslashes, brackets, braces, and control characters force
+// quoting. Each delimiter gets one class that also holds it, so a value is
+// scanned once; tab is already a control character.
+/* eslint-disable no-control-regex */
+const FORBIDDEN_UNQUOTED_PATTERN = /[:"\\[\]{}\u0000-\u001F]/
+const FORBIDDEN_UNQUOTED_PATTERNS: ReadonlyMap<string, RegExp> = new Map([
+  [COMMA, /[:"\\[\]{},\u0000-\u001F]/],
+  [PIPE, /[:"\\[\]{}|\u0000-\u001F]/],
+  [TAB, FORBIDDEN_UNQUOTED_PATTERN],
+])
+/* eslint-enable no-control-regex */
+
+// Which part of an unquoted key a character may fill, indexed by char code:
+// letters and `_` may start one, digits and `.` may only continue it, and
+// everything else (including all codes outside ASCII) stays 0.
+const KEY_CHAR_CONTINUE = 1
+const KEY_CHAR_START = 2
+
+const KEY_CHAR_CLASSES = createKeyCharClasses()
+
+function createKeyCharClasses(): Uint8Array {
+  const classes = new Uint8Array(128)
+  for (let code = 'A'.charCodeAt(0); code <= 'Z'.charCodeAt(0); code++) {
+    classes[code] = KEY_CHAR_START
+  }
+  for (let code = 'a'.charCodeAt(0); code <= 'z'.charCodeAt(0); code++) {
+    classes[code] = KEY_CHAR_START
+  }
+  classes['_'.charCodeAt(0)] = KEY_CHAR_START
+  for (let code = '0'.charCodeAt(0); code <= '9'.charCodeAt(0); code++) {
+    classes[code] = KEY_CHAR_CONTINUE
+  }
+  classes['.'.charCodeAt(0)] = KEY_CHAR_CONTINUE
+  return classes
+}
+
+// Built once: every `encode` call validates its delimiter option.
+const VALID_DELIMITERS: ReadonlySet<string> = new Set(Object.values(DELIMITERS))
+
 /** Narrows an arbitrary delimiter option, shared by the library and the CLI so both report it alike. */
 export function assertValidDelimiter(delimiter: string): asserts delimiter is Delimiter {
-  if (!(Object.values(DELIMITERS) as string[]).includes(delimiter)) {
+  if (!VALID_DELIMITERS.has(delimiter)) {
     throw new TypeError(`Invalid delimiter ${JSON.stringify(delimiter)}. Valid delimiters are: comma (,), tab (\\t), pipe (|)`)
   }
 }
@@ -19,7 +58,21 @@ export function assertValidDelimiter(delimiter: string): asserts delimiter is De
  * followed by letters, digits, underscores, or dots.
  */
 export function isValidUnquotedKey(key: string): boolean {
-  return /^[A-Z_][\w.]*$/i.test(key)
+  if (key.length === 0 || !isKeyCharCode(key.charCodeAt(0), KEY_CHAR_START)) {
+    return false
+  }
+
+  for (let index = 1; index < key.length; index++) {
+    if (!isKeyCharCode(key.charCodeAt(index), KEY_CHAR_CONTINUE)) {
+      return false
+    }
+  }
+
+  return true
+}
+
+function isKeyCharCode(code: number, minimumClass: number): boolean {
+  return code < KEY_CHAR_CLASSES.length && KEY_CHAR_CLASSES[code]! >= minimumClass
 }
 
 /**
@@ -43,7 +96,9 @@ export function isSafeUnquoted(value: string, delimiter: string = DEFAULT_DELIMI
   }
 
   // Only space and tab force quoting, unlike host `trim()`, which also strips other Unicode whitespace.
-  if (/^[ \t]|[ \t]$/.test(value)) {
+  const first = value[0]
+  const last = value[value.length - 1]
+  if (first === SPACE || first === TAB || last === SPACE || last === TAB) {
     return false
   }
 
@@ -51,32 +106,18 @@ export function isSafeUnquoted(value: string, delimiter: string = DEFAULT_DELIMI
     return false
   }
 
-  if (value.includes(':')) {
-    return false
+  const forbiddenPattern = FORBIDDEN_UNQUOTED_PATTERNS.get(delimiter)
+  if (forbiddenPattern) {
+    if (forbiddenPattern.test(value)) {
+      return false
+    }
   }
-
-  if (value.includes('"') || value.includes('\\')) {
-    return false
-  }
-
-  if (/[[\]{}]/.test(value)) {
+  else if (FORBIDDEN_UNQUOTED_PATTERN.test(value) || value.includes(delimiter)) {
     return false
   }
 
-  // eslint-disable-next-line no-control-regex
-  if (/[\u0000-\u001F]/.test(value)) {
-    return false
-  }
-
-  if (value.includes(delimiter)) {
-    return false
-  }
-
-  if (value.startsWith(LIST_ITEM_MARKER)) {
-    return false
-  }
-
-  if (value.startsWith(COMMENT_MARKER)) {
+  // Both markers are single characters, so the first character settles them.
+  if (first === LIST_ITEM_MARKER || first === COMMENT_MARKER) {
     return false
   }
 
@@ -84,5 +125,12 @@ export function isSafeUnquoted(value: string, delimiter: string = DEFAULT_DELIMI
 }
 
 function isNumericLike(value: string): boolean {
+  // Only a sign or a digit can open a numeric-like value, which settles most
+  // strings without running the pattern.
+  const first = value[0]!
+  if (first !== '+' && first !== '-' && (first < '0' || first > '9')) {
+    return false
+  }
+
   return NUMERIC_LIKE_PATTERN.test(value)
 }
@@ -124,8 +124,8 @@ export type JsonStreamEvent
  * carries its subfields and materializes a nested object per row.
  */
 export interface FieldNode {
-  name: string
-  children?: FieldNode[]
+  readonly name: string
+  readonly children?: readonly FieldNode[]
 }
 
 // #endregion
@@ -136,7 +136,7 @@ export interface ArrayHeaderInfo {
   key?: string
   length: number
   delimiter: Delimiter
-  fields?: FieldNode[]
+  fields?: readonly FieldNode[]
   /** Keyed tabular header `[N:<delim?>]` – N declares the entry count. */
   keyed?: boolean
 }
@@ -147,12 +147,8 @@ export interface ParsedLine {
   indent: number
   content: string
   lineNumber: number
-}
-
-export interface BlankLineInfo {
-  lineNumber: number
-  indent: number
-  depth: Depth
+  /** Whether `content` is a list item: the bare `-` marker or the `- ` prefix. */
+  isListItem: boolean
 }
 
 // #endregion
@@ -87,3 +87,20 @@ describe('quoted content opacity (round-trip)', () => {
     expect(decode(encode(event))).toEqual(event)
   })
 })
+
+describe('field lists shared across decodes', () => {
+  it('decodes later documents that repeat a field list', () => {
+    expect(decode('users[2]{id,meta{role}}:\n  1,admin\n  2,user')).toEqual({
+      users: [{ id: 1, meta: { role: 'admin' } }, { id: 2, meta: { role: 'user' } }],
+    })
+    expect(decode('users[1]{id,meta{role}}:\n  3,guest')).toEqual({
+      users: [{ id: 3, meta: { role: 'guest' } }],
+    })
+  })
+
+  it('does not keep a field list that failed to parse', () => {
+    expect(() => decode('rows[1]{id,}:\n  1,')).toThrow('Empty field name')
+    expect(() => decode('rows[1]{id,}:\n  1,')).toThrow('Empty field name')
+    expect(decode('rows[1]{id,name}:\n  1,a')).toEqual({ rows: [{ id: 1, name: 'a' }] })
+  })
+})